@@ -1,10 +1,111 @@
 import streamlit as st
 import re
-import random
+import itertools
+import functools
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from datetime import datetime
 
+# Optional compiled fused sentence pass; build with
+# `python setup.py build_ext --inplace` (requires Cython)
+try:
+    from humanizer_core import fused_sentence_pass
+except ImportError:
+    fused_sentence_pass = None
+
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_SENT_SENTINEL = '\x1f'
+_SPLIT_FALLBACK = ('  ', '\t', '\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', _SENT_SENTINEL)
+_ALL_TRANS = re.compile(r'\b(Furthermore|Moreover|Additionally|However|Nevertheless)\b')
+_DUP_PUNCT = re.compile(r'([!?])\1+', re.ASCII)
+
+# Sentence rewrite kinds, shared with the humanizer_core kernel
+_PREFIX_UNLESS_PRESENT = 0
+_PREFIX = 1
+_FIRST_COMMA_DASH = 2
+
+_ADDITIVE_TRANSITIONS = [
+    'In alignment with our strategic framework,', 
+    'Complementing our comprehensive approach,', 
+    'Extending our core insights,'
+]
+_CONTRAST_TRANSITIONS = [
+    'Balancing our strategic considerations,', 
+    'Navigating potential complexities,', 
+    'With nuanced strategic perspective,'
+]
+_TRANS_MAP = {
+    'Furthermore': _ADDITIVE_TRANSITIONS,
+    'Moreover': _ADDITIVE_TRANSITIONS,
+    'Additionally': _ADDITIVE_TRANSITIONS,
+    'However': _CONTRAST_TRANSITIONS,
+    'Nevertheless': _CONTRAST_TRANSITIONS
+}
+
+def _split_sentences(text):
+    # str.replace + str.split matches the regex whenever every sentence
+    # break is a single ASCII space; anything else falls back to the regex
+    if not text.isascii() or any(ws in text for ws in _SPLIT_FALLBACK):
+        return _SENT_SPLIT_RE.split(text)
+    marked = (text.replace('. ', '.' + _SENT_SENTINEL)
+                  .replace('! ', '!' + _SENT_SENTINEL)
+                  .replace('? ', '?' + _SENT_SENTINEL))
+    return marked.split(_SENT_SENTINEL)
+
+def _pick_insertions(n, p, rng):
+    # The n word gaps that get a marker, from one vectorized draw
+    return np.flatnonzero(rng.random(n) < p)
+
+# Upper bound on transformation records kept per humanizer or session
+HISTORY_MAXLEN = 1000
+
+_STYLE_MODIFIERS = {
+    'Professional': {'factor': 1.2, 'mods': 4},
+    'Casual': {'factor': 0.9, 'mods': 3},
+    'Technical': {'factor': 1.5, 'mods': 5}
+}
+_DEFAULT_STYLE = {'factor': 1.0, 'mods': 3}
+
+@functools.lru_cache(maxsize=64)
+def _resolve_num_mods(style, intensity, total):
+    # Only a handful of (style, intensity) pairs ever occur, so resolve each
+    # once instead of redoing the table lookup and rounding per request
+    style_config = _STYLE_MODIFIERS.get(style, _DEFAULT_STYLE)
+    return max(2, min(total, 
+                      round(style_config['mods'] * (intensity/5) * style_config['factor'])))
+
+def _level(level, pre=None):
+    # Tag a modification with the stage it runs in ('text', 'sentence' or
+    # 'word') and the name of an optional text-level pre-pass
+    def tag(func):
+        func._level = level
+        func._pre = pre
+        return func
+    return tag
+
 # ---------------------- EnhancedTextHumanizer Class ----------------------
 class EnhancedTextHumanizer:
+    ENTERPRISE_INTERJECTIONS = (
+        'Strategically speaking,', 
+        'Core insights suggest,', 
+        'From an operational standpoint,'
+    )
+    ENTERPRISE_QUALIFIERS = (
+        'Strategic insights reveal that',
+        'Our comprehensive analysis indicates',
+        'From a holistic perspective,',
+        'Leveraging our deep expertise,'
+    )
+    HESITATION_MARKERS = (
+        ' — considering the broader context, ', 
+        ' ... strategically speaking, ', 
+        ' with careful consideration, ', 
+        ' pivoting our perspective, '
+    )
+
     def __init__(self):
         self.modifications = [
             self._add_professional_transitions,
@@ -13,126 +114,200 @@ class EnhancedTextHumanizer:
             self._add_enterprise_nuance,
             self._refine_enterprise_punctuation
         ]
-        self.transformation_history = []
-        self.enterprise_qualifiers = [
-            'Strategic insights reveal that',
-            'Our comprehensive analysis indicates',
-            'From a holistic perspective,',
-            'Leveraging our deep expertise,'
-        ]
-
-    def _add_professional_transitions(self, text):
-        transition_mappings = {
-            r'\b(Furthermore|Moreover|Additionally)\b': [
-                'In alignment with our strategic framework,', 
-                'Complementing our comprehensive approach,', 
-                'Extending our core insights,'
-            ],
-            r'\b(However|Nevertheless)\b': [
-                'Balancing our strategic considerations,', 
-                'Navigating potential complexities,', 
-                'With nuanced strategic perspective,'
-            ]
+        # Every ordered selection of 2+ modifications, grouped by size and
+        # already split into stages
+        self._mod_orders = {
+            r: [self._stage_plan(plan) for plan in itertools.permutations(self.modifications, r)]
+            for r in range(2, len(self.modifications) + 1)
+        }
+        # Bounded so a long-lived session doesn't grow the history forever
+        self.transformation_history = deque(maxlen=HISTORY_MAXLEN)
+        self.enterprise_qualifiers = self.ENTERPRISE_QUALIFIERS
+        # Modifications that rewrite one sentence, passed as a list of
+        # space-separated parts so prefixes never build intermediate strings.
+        # Each maps to (probability, phrases, kind): the first two drive the
+        # batched per-sentence draw, kind tells the compiled kernel what the
+        # method does
+        self._sentence_mods = {
+            self._vary_sentence_structure: (0.5, self.ENTERPRISE_INTERJECTIONS, _PREFIX_UNLESS_PRESENT),
+            self._add_enterprise_nuance: (0.4, self.enterprise_qualifiers, _PREFIX),
+            self._refine_enterprise_punctuation: (0.3, None, _FIRST_COMMA_DASH)
         }
-        for pattern, replacements in transition_mappings.items():
-            text = re.sub(pattern, lambda m: random.choice(replacements), text)
+        self._hesitation_stripped = tuple(m.strip() for m in self.HESITATION_MARKERS)
+        # Each run draws from its own seeded generator, so the shared
+        # instance holds no per-request state and runs memoize per instance
+        self._humanize_impl = functools.lru_cache(maxsize=256)(self._humanize_impl)
+
+    def _stage_plan(self, plan):
+        # Group a plan by level, keeping selection order within each stage
+        text_passes = []
+        for mod in plan:
+            if mod._level == 'text':
+                text_passes.append(mod)
+            elif mod._pre is not None:
+                text_passes.append(getattr(self, mod._pre))
+        sentence_mods = tuple(mod for mod in plan if mod._level == 'sentence')
+        word_mods = tuple(mod for mod in plan if mod._level == 'word')
+        mod_names = tuple(mod.__name__ for mod in plan)
+        return tuple(text_passes), sentence_mods, word_mods, mod_names
+
+    @_level('text')
+    def _add_professional_transitions(self, text, rng):
+        # Matched words land at odd indices of the capturing split, so every
+        # replacement comes from one batched draw
+        pieces = _ALL_TRANS.split(text)
+        if len(pieces) > 1:
+            draws = rng.random(len(pieces) // 2).tolist()
+            for i, r in zip(range(1, len(pieces), 2), draws):
+                replacements = _TRANS_MAP[pieces[i]]
+                pieces[i] = replacements[int(r * len(replacements))]
+            text = ''.join(pieces)
         return text
 
-    def _vary_sentence_structure(self, text):
-        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-        varied_sentences = []
-        for sentence in sentences:
-            if random.random() < 0.5:
-                interjections = [
-                    'Strategically speaking,', 
-                    'Core insights suggest,', 
-                    'From an operational standpoint,'
-                ]
-                if not any(sentence.startswith(interj) for interj in interjections):
-                    sentence = f"{random.choice(interjections)} {sentence}"
-            varied_sentences.append(sentence)
-        return ' '.join(varied_sentences)
-
-    def _introduce_professional_hesitation(self, text):
-        hesitation_markers = [
-            ' — considering the broader context, ', 
-            ' ... strategically speaking, ', 
-            ' with careful consideration, ', 
-            ' pivoting our perspective, '
-        ]
-        words = text.split()
-        for i in range(len(words)-1, 0, -1):
-            if random.random() < 0.15:
-                words.insert(i, random.choice(hesitation_markers).strip())
-        return ' '.join(words)
-
-    def _add_enterprise_nuance(self, text):
-        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-        nuanced_sentences = []
-        for sentence in sentences:
-            if random.random() < 0.4:
-                sentence = f"{random.choice(self.enterprise_qualifiers)} {sentence}"
-            nuanced_sentences.append(sentence)
-        return ' '.join(nuanced_sentences)
-
-    def _refine_enterprise_punctuation(self, text):
-        text = re.sub(r'(!{2,})', '!', text)
-        text = re.sub(r'(\?{2,})', '?', text)
-        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-        refined_sentences = []
-        for sentence in sentences:
-            if random.random() < 0.3:
-                parts = sentence.split(',')
-                if len(parts) > 1:
-                    sentence = f"{parts[0]} — {','.join(parts[1:])}"
-            refined_sentences.append(sentence)
-        return ' '.join(refined_sentences)
-
-    def humanize(self, text, style='Professional', intensity=5):
+    @_level('sentence')
+    def _vary_sentence_structure(self, parts, pick):
+        interjections = self.ENTERPRISE_INTERJECTIONS
+        if not parts[0].startswith(interjections):
+            parts.insert(0, interjections[pick])
+        return parts
+
+    @_level('word')
+    def _introduce_professional_hesitation(self, parts, rng):
+        markers = self._hesitation_stripped
+        words = [word for part in parts for word in part.split()]
+        n = max(len(words) - 1, 0)
+        gaps = _pick_insertions(n, 0.15, rng).tolist()
+        # Short inputs often draw no insertions; the words go out as they are
+        if not gaps:
+            return words
+        marker_idx = rng.integers(0, len(markers), size=len(gaps)).tolist()
+        # Copy the runs of words between insertion points into a
+        # preallocated output with slice assignment
+        out = [None] * (len(words) + len(gaps))
+        w = o = 0
+        for gap, idx in zip(gaps, marker_idx):
+            end = gap + 1
+            o_end = o + end - w
+            out[o:o_end] = words[w:end]
+            out[o_end] = markers[idx]
+            o = o_end + 1
+            w = end
+        out[o:] = words[w:]
+        return out
+
+    @_level('sentence')
+    def _add_enterprise_nuance(self, parts, pick):
+        parts.insert(0, self.enterprise_qualifiers[pick])
+        return parts
+
+    def _collapse_punctuation(self, text, rng=None):
+        # Takes rng only to share the text-pass signature; draws nothing
+        # Clean input is the common case; the substring scans skip the regex
+        if '!!' in text or '??' in text:
+            text = _DUP_PUNCT.sub(r'\1', text)
+        return text
+
+    @_level('sentence', pre='_collapse_punctuation')
+    def _refine_enterprise_punctuation(self, parts, pick):
+        for i, part in enumerate(parts):
+            if ',' in part:
+                parts[i] = part.replace(',', ' — ', 1)
+                break
+        return parts
+
+    def _fused_sentence_pass(self, sentences, draws):
+        if fused_sentence_pass is not None:
+            return fused_sentence_pass(sentences, draws)
+        fused = []
+        extend = fused.extend
+        for i, sentence in enumerate(sentences):
+            sentence_parts = [sentence]
+            for modification, _, hits, picks, _ in draws:
+                if hits[i]:
+                    sentence_parts = modification(sentence_parts, picks[i])
+            extend(sentence_parts)
+        return fused
+
+    def humanize(self, text, style='Professional', intensity=5, seed=None, history=None):
         if not text:
             return text
-        style_modifiers = {
-            'Professional': {'factor': 1.2, 'mods': 4},
-            'Casual': {'factor': 0.9, 'mods': 3},
-            'Technical': {'factor': 1.5, 'mods': 5}
-        }
-        style_config = style_modifiers.get(style, {'factor': 1.0, 'mods': 3})
-        num_mods = max(2, min(len(self.modifications), 
-                               round(style_config['mods'] * (intensity/5) * style_config['factor'])))
-        selected_mods = random.sample(self.modifications, num_mods)
-        humanized_text = text
-        for modification in selected_mods:
-            humanized_text = modification(humanized_text)
+        # Derive the seed from the text when none is given so identical
+        # requests are deterministic and served from the cache
+        if seed is None:
+            seed = hash(text) & 0xFFFFFFFF
+        humanized_text, mod_names = self._humanize_impl(text, style, intensity, seed)
         transformation_record = {
-            'timestamp': datetime.now().isoformat(),
+            # Epoch seconds; formatted only when a record is displayed
+            'timestamp': time.time(),
             'original_length': len(text),
             'humanized_length': len(humanized_text),
             'style': style,
             'intensity': intensity,
-            'modifications_applied': [mod.__name__ for mod in selected_mods]
+            'modifications_applied': list(mod_names)
         }
-        self.transformation_history.append(transformation_record)
+        # Callers sharing this instance pass their own history to record into
+        if history is None:
+            history = self.transformation_history
+        history.append(transformation_record)
         return humanized_text
 
+    def humanize_batch(self, texts, style='Professional', intensity=5, history=None):
+        # Runs share no mutable state, so texts go through a thread pool;
+        # NumPy draws release the GIL but the string stages still hold it.
+        # Each text records into its own list, appended in input order
+        def run(text):
+            records = []
+            return self.humanize(text, style, intensity, history=records), records
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            results = list(pool.map(run, texts))
+        if history is None:
+            history = self.transformation_history
+        for _, records in results:
+            history.extend(records)
+        return [humanized_text for humanized_text, _ in results]
+
+    def _humanize_impl(self, text, style, intensity, seed):
+        rng = np.random.default_rng(seed)
+        plans = self._mod_orders[_resolve_num_mods(style, intensity, len(self.modifications))]
+        text_passes, sentence_mods, word_mods, mod_names = plans[rng.integers(len(plans))]
+        # Strip once up front; text-level passes run on the string, then
+        # sentence- and word-level passes on a single tokenization
+        humanized_text = text.strip()
+        for modification in text_passes:
+            humanized_text = modification(humanized_text, rng)
+        if sentence_mods or word_mods:
+            # Tokenize once; sentence passes and word-level hesitation share
+            # the list and the text is joined back a single time
+            parts = _split_sentences(humanized_text)
+            if sentence_mods:
+                n = len(parts)
+                # One batched draw per modification decides which sentences
+                # it rewrites and which phrase each of them gets
+                draws = []
+                for modification in sentence_mods:
+                    prob, phrases, kind = self._sentence_mods[modification]
+                    hits = (rng.random(n) < prob).tolist()
+                    picks = (rng.integers(0, len(phrases), size=n).tolist()
+                             if phrases else [0] * n)
+                    draws.append((modification, kind, hits, picks, phrases))
+                parts = self._fused_sentence_pass(parts, draws)
+            for modification in word_mods:
+                parts = modification(parts, rng)
+            humanized_text = ' '.join(parts)
+        return humanized_text, mod_names
+
 # ---------------------- Main App ----------------------
-def main():
-    st.set_page_config(
-        page_title="Enterprise Text Intelligence", 
-        page_icon="🏢",
-        layout="wide"
-    )
+ENTERPRISE_BLUE = {
+    'primary': '#0D47A1',
+    'secondary': '#1565C0',
+    'accent': '#2196F3',
+    'background': '#F1F8E9',
+    'text': '#212121',
+    'white': '#FFFFFF'
+}
 
-    ENTERPRISE_BLUE = {
-        'primary': '#0D47A1',
-        'secondary': '#1565C0',
-        'accent': '#2196F3',
-        'background': '#F1F8E9',
-        'text': '#212121',
-        'white': '#FFFFFF'
-    }
-
-    # CSS
-    st.markdown(f"""
+# CSS
+_ENTERPRISE_CSS = f"""
     <style>
     .stApp {{
         background-color: {ENTERPRISE_BLUE['background']};
@@ -170,10 +345,32 @@ def main():
         white-space: pre-wrap;
     }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+@st.cache_resource
+def _inject_css():
+    st.markdown(_ENTERPRISE_CSS, unsafe_allow_html=True)
+
+@st.cache_resource
+def get_humanizer():
+    # Shared across sessions; per-session history lives in st.session_state
+    return EnhancedTextHumanizer()
+
+def _format_record(record):
+    return {**record, 'timestamp': datetime.fromtimestamp(record['timestamp']).isoformat()}
+
+def main():
+    st.set_page_config(
+        page_title="Enterprise Text Intelligence", 
+        page_icon="🏢",
+        layout="wide"
+    )
+
+    _inject_css()
 
-    if 'humanizer' not in st.session_state:
-        st.session_state.humanizer = EnhancedTextHumanizer()
+    humanizer = get_humanizer()
+    if 'transformation_history' not in st.session_state:
+        st.session_state.transformation_history = deque(maxlen=HISTORY_MAXLEN)
 
     st.title("🏢 Enterprise Text Intelligence Platform")
     st.markdown("<p class='big-font'>Transform Your Communication with AI-Powered Insights</p>", unsafe_allow_html=True)
@@ -192,9 +389,11 @@ def main():
         humanize_button = st.button("Humanize Text", type="primary")
 
     if humanize_button and input_text:
-        humanized_text = st.session_state.humanizer.humanize(
-            input_text, style=style, intensity=intensity
+        humanized_text = humanizer.humanize(
+            input_text, style=style, intensity=intensity,
+            history=st.session_state.transformation_history
         )
+        last_transformation = st.session_state.transformation_history[-1]
 
         st.markdown("### 📊 Transformation Summary")
         st.markdown(f"- Original Length: **{len(input_text)} characters**")
@@ -207,17 +406,16 @@ def main():
             st.markdown("### 📝 Original Text")
             st.markdown(f"<div class='result-box'>{input_text}</div>", unsafe_allow_html=True)
             st.download_button("📥 Download Original", input_text, file_name="original_text.txt")
-            st.code(input_text, language="markdown")
 
         with col_human:
             st.markdown("### 🚀 Humanized Text")
             st.markdown(f"<div class='result-box'>{humanized_text}</div>", unsafe_allow_html=True)
             st.download_button("📥 Download Humanized", humanized_text, file_name="humanized_text.txt")
-            st.code(humanized_text, language="markdown")
+            with st.expander("Raw markdown"):
+                st.code(humanized_text, language="markdown")
 
         with st.expander("Transformation Insights"):
-            last_transformation = st.session_state.humanizer.transformation_history[-1]
-            st.json(last_transformation)
+            st.json(_format_record(last_transformation))
 
     elif humanize_button and not input_text:
         st.warning("Please enter some text to transform!")
@@ -1,8 +1,50 @@
 import streamlit as st
 import re
-import random
+import itertools
+import functools
+import numpy as np
+
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_SENT_SENTINEL = '\x1f'
+# Whitespace the single-space fast path in _split_sentences can't handle
+_SPLIT_FALLBACK = ('  ', '\t', '\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', _SENT_SENTINEL)
+_ALL_TRANS = re.compile(r'\b(Furthermore|Moreover|Additionally|However|Nevertheless)\b')
+_DUP_PUNCT = re.compile(r'([!?])\1+', re.ASCII)
+
+_ADDITIVE_TRANSITIONS = ['In light of this,', 'Considering this context,', 'From another perspective,']
+_CONTRAST_TRANSITIONS = ['On the other hand,', 'With that said,', 'It\'s worth noting that']
+_TRANS_MAP = {
+    'Furthermore': _ADDITIVE_TRANSITIONS,
+    'Moreover': _ADDITIVE_TRANSITIONS,
+    'Additionally': _ADDITIVE_TRANSITIONS,
+    'However': _CONTRAST_TRANSITIONS,
+    'Nevertheless': _CONTRAST_TRANSITIONS
+}
+
+def _split_sentences(text):
+    """
+    Split text into sentences after ., ! or ? followed by whitespace
+    """
+    # The regex is only needed for runs of whitespace, non-space breaks
+    # or non-ASCII input; otherwise mark single-space breaks and split
+    # on the sentinel in C
+    if not text.isascii() or any(ws in text for ws in _SPLIT_FALLBACK):
+        return _SENT_SPLIT_RE.split(text)
+    marked = (text.replace('. ', '.' + _SENT_SENTINEL)
+                  .replace('! ', '!' + _SENT_SENTINEL)
+                  .replace('? ', '?' + _SENT_SENTINEL))
+    return marked.split(_SENT_SENTINEL)
 
 class TextHumanizer:
+    INTERJECTIONS = ('Notably,', 'Interestingly,', 'Indeed,')
+    QUALIFIERS = (
+        'It appears that',
+        'From our analysis,',
+        'Based on current insights,',
+        'Our research suggests that'
+    )
+    HESITATION_MARKERS = (' — ', ' ... ', ' well, ', ' actually, ')
+
     def __init__(self):
         """
         Initialize the Text Humanizer with comprehensive transformations
@@ -14,129 +56,186 @@ class TextHumanizer:
             self._add_contextual_nuance,
             self._refine_punctuation
         ]
+        # Modifications that rewrite one sentence at a time, given as a list
+        # of space-separated parts; humanize runs them together in a single
+        # pass over one sentence split. Each maps to the probability of
+        # touching a sentence and the phrases it picks from
+        self._sentence_mods = {
+            self._vary_sentence_structure: (0.4, self.INTERJECTIONS),
+            self._add_contextual_nuance: (0.3, self.QUALIFIERS),
+            self._refine_punctuation: (0.2, None)
+        }
+        # Every ordered selection of 2+ modifications, grouped by size, so
+        # picking a plan in humanize is a single draw
+        self._mod_orders = {
+            r: list(itertools.permutations(self.modifications, r))
+            for r in range(2, len(self.modifications) + 1)
+        }
+        self._hesitation_stripped = tuple(m.strip() for m in self.HESITATION_MARKERS)
+        # Seeded runs are deterministic, so memoize them per instance
+        self._humanize_impl = functools.lru_cache(maxsize=256)(self._humanize_impl)
 
-    def _simple_sentence_split(self, text):
-        """
-        Split text into sentences using regex
-        """
-        # Use a more robust sentence splitting regex
-        return re.split(r'(?<=[.!?])\s+', text.strip())
-
-    def _add_professional_transitions(self, text):
+    def _add_professional_transitions(self, text, rng):
         """Add nuanced, professional-sounding transition words"""
-        transition_mappings = {
-            r'\b(Furthermore|Moreover|Additionally)\b': ['In light of this,', 'Considering this context,', 'From another perspective,'],
-            r'\b(However|Nevertheless)\b': ['On the other hand,', 'With that said,', 'It\'s worth noting that']
-        }
-        
-        for pattern, replacements in transition_mappings.items():
-            text = re.sub(pattern, lambda m: random.choice(replacements), text)
+        # One scan over the text; the capturing split puts matched words at
+        # odd indices so all replacements come from a single batched draw
+        pieces = _ALL_TRANS.split(text)
+        if len(pieces) > 1:
+            draws = rng.random(len(pieces) // 2).tolist()
+            for i, r in zip(range(1, len(pieces), 2), draws):
+                replacements = _TRANS_MAP[pieces[i]]
+                pieces[i] = replacements[int(r * len(replacements))]
+            text = ''.join(pieces)
         
         return text
 
-    def _vary_sentence_structure(self, text):
+    def _vary_sentence_structure(self, parts, pick):
         """Introduce variations in sentence structure"""
-        sentences = self._simple_sentence_split(text)
-        
-        varied_sentences = []
+        # Add professional interjections
+        if not parts[0].startswith(self.INTERJECTIONS):
+            parts.insert(0, self.INTERJECTIONS[pick])
         
-        for sentence in sentences:
-            # Randomly decide to modify sentence structure
-            if random.random() < 0.4:
-                # Add professional interjections
-                interjections = ['Notably,', 'Interestingly,', 'Indeed,']
-                if not any(sentence.startswith(interj) for interj in interjections):
-                    sentence = f"{random.choice(interjections)} {sentence}"
-            
-            varied_sentences.append(sentence)
-        
-        return ' '.join(varied_sentences)
+        return parts
 
-    def _introduce_natural_hesitation(self, text):
-        """Add subtle, natural hesitation markers"""
-        hesitation_markers = [' — ', ' ... ', ' well, ', ' actually, ']
+    def _introduce_natural_hesitation(self, parts, rng):
+        """Add subtle, natural hesitation markers between words"""
+        markers = self._hesitation_stripped
         
-        # Split into words and occasionally insert hesitation
-        words = text.split()
-        for i in range(len(words)-1, 0, -1):
-            if random.random() < 0.1:
-                words.insert(i, random.choice(hesitation_markers).strip())
+        # Build the output in one pass, inserting hesitation between words
+        # wherever a single bulk random draw says so
+        words = [word for part in parts for word in part.split()]
+        n = max(len(words) - 1, 0)
+        mask = (rng.random(n) < 0.1).tolist()
+        marker_idx = rng.integers(0, len(markers), size=n).tolist()
+        out = words[:1]
+        for word, insert, idx in zip(words[1:], mask, marker_idx):
+            if insert:
+                out.append(markers[idx])
+            out.append(word)
         
-        return ' '.join(words)
+        return out
 
-    def _add_contextual_nuance(self, text):
+    def _add_contextual_nuance(self, parts, pick):
         """Add contextual nuance and professional qualifiers"""
-        sentences = self._simple_sentence_split(text)
-        
-        qualifiers = [
-            'It appears that',
-            'From our analysis,',
-            'Based on current insights,',
-            'Our research suggests that'
-        ]
-        
-        nuanced_sentences = []
+        parts.insert(0, self.QUALIFIERS[pick])
         
-        for sentence in sentences:
-            # Occasionally prefix with a qualifier
-            if random.random() < 0.3:
-                sentence = f"{random.choice(qualifiers)} {sentence}"
-            
-            nuanced_sentences.append(sentence)
+        return parts
+
+    def _collapse_punctuation(self, text):
+        """Replace overused punctuation across the whole text"""
+        # Clean input is the common case; the substring scans skip the regex
+        if '!!' in text or '??' in text:
+            text = _DUP_PUNCT.sub(r'\1', text)
         
-        return ' '.join(nuanced_sentences)
+        return text
 
-    def _refine_punctuation(self, text):
+    def _refine_punctuation(self, parts, pick):
         """Refine punctuation for more natural flow"""
-        # Replace overused punctuation
-        text = re.sub(r'(!{2,})', '!', text)
-        text = re.sub(r'(\?{2,})', '?', text)
-        
-        sentences = self._simple_sentence_split(text)
-        refined_sentences = []
-        
-        for sentence in sentences:
-            if random.random() < 0.2:
-                parts = sentence.split(',')
-                if len(parts) > 1:
-                    sentence = f"{parts[0]} — {','.join(parts[1:])}"
-            
-            refined_sentences.append(sentence)
+        # Swap the first comma in the sentence for an em-dash
+        for i, part in enumerate(parts):
+            if ',' in part:
+                parts[i] = part.replace(',', ' — ', 1)
+                break
         
-        return ' '.join(refined_sentences)
+        return parts
 
-    def humanize(self, text):
+    def humanize(self, text, seed=None):
         """
         Apply a random subset of humanization techniques
         
+        Text-level passes run on the raw string; sentence-level passes and
+        word-level hesitation then share a single sentence tokenization that
+        is joined back once.
+        
         Args:
             text (str): Input text to humanize
+            seed (int, optional): Seed for reproducible output
         
         Returns:
             str: Humanized text
         """
         if not text:
             return text
+        # Without an explicit seed, derive one from the text so repeated
+        # requests for the same input hit the cache
+        if seed is None:
+            seed = hash(text) & 0xFFFFFFFF
+        
+        return self._humanize_impl(text, seed)
+
+    def _humanize_impl(self, text, seed):
+        """
+        Run the seeded humanization pipeline; memoized in __init__
+        """
+        # A private generator per run keeps the shared instance free of
+        # per-request state without touching the global random state
+        rng = np.random.default_rng(seed)
 
         # Randomly select and apply modifications
-        num_mods = random.randint(2, len(self.modifications))
-        selected_mods = random.sample(self.modifications, num_mods)
+        num_mods = int(rng.integers(2, len(self.modifications) + 1))
+        plans = self._mod_orders[num_mods]
+        selected_mods = plans[rng.integers(len(plans))]
+        sentence_mods = [mod for mod in selected_mods if mod in self._sentence_mods]
         
         humanized_text = text
-        for modification in selected_mods:
-            humanized_text = modification(humanized_text)
+        if self._add_professional_transitions in selected_mods:
+            humanized_text = self._add_professional_transitions(humanized_text, rng)
+        if self._refine_punctuation in selected_mods:
+            humanized_text = self._collapse_punctuation(humanized_text)
+        
+        hesitate = self._introduce_natural_hesitation in selected_mods
+        if sentence_mods or hesitate:
+            # Tokenize once; sentence passes and word-level hesitation share
+            # the list and the text is joined back a single time
+            parts = _split_sentences(humanized_text.strip())
+            
+            if sentence_mods:
+                n = len(parts)
+                
+                # Draw every modification's per-sentence decisions and phrase
+                # picks in one batch up front
+                draws = []
+                for modification in sentence_mods:
+                    prob, phrases = self._sentence_mods[modification]
+                    hits = (rng.random(n) < prob).tolist()
+                    picks = (rng.integers(0, len(phrases), size=n).tolist()
+                             if phrases else [0] * n)
+                    draws.append((modification, hits, picks))
+                
+                # Each sentence is carried as a list of space-separated parts
+                # so prefixes are collected into one flat list
+                fused = []
+                extend = fused.extend
+                for i, sentence in enumerate(parts):
+                    sentence_parts = [sentence]
+                    for modification, hits, picks in draws:
+                        if hits[i]:
+                            sentence_parts = modification(sentence_parts, picks[i])
+                    extend(sentence_parts)
+                parts = fused
+            
+            if hesitate:
+                parts = self._introduce_natural_hesitation(parts, rng)
+            humanized_text = ' '.join(parts)
         
         return humanized_text
 
+@st.cache_resource
+def get_humanizer():
+    """
+    Build one TextHumanizer shared by every session
+    """
+    return TextHumanizer()
+
 def main():
     """
     Streamlit application for text humanization
     """
-    # Initialize the humanizer
-    humanizer = TextHumanizer()
-
     # App title and description
     st.set_page_config(page_title="Text Humanizer", page_icon="✍️")
+
+    # Shared humanizer, built once per server process
+    humanizer = get_humanizer()
     st.title("🤖➡️👥 Text Humanizer")
     st.markdown("Transform AI-generated text into natural, conversational language")
 
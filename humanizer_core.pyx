@@ -0,0 +1,44 @@
+# cython: language_level=3
+"""
+Compiled fused sentence pass for EnhancedTextHumanizer.
+
+Mirrors the pure-Python sentence modifications in aitexthumaizer.py. Each
+draw is ``(modification, kind, hits, picks, phrases)``; the ``modification``
+callable is unused here and the kind selects the rewrite:
+
+- 0: prefix ``phrases[pick]`` unless the sentence already starts with one
+- 1: prefix ``phrases[pick]``
+- 2: swap the first comma in the sentence for an em-dash
+
+Build in place with ``python setup.py build_ext --inplace``.
+"""
+
+
+cpdef list fused_sentence_pass(list sentences, list draws):
+    cdef list fused = []
+    cdef list parts, hits, picks
+    cdef tuple draw, phrases
+    cdef str part
+    cdef Py_ssize_t i, j, n = len(sentences)
+    cdef int kind
+
+    for i in range(n):
+        parts = [sentences[i]]
+        for draw in draws:
+            hits = <list>draw[2]
+            if not hits[i]:
+                continue
+            kind = draw[1]
+            if kind == 2:
+                for j in range(len(parts)):
+                    part = <str>parts[j]
+                    if ',' in part:
+                        parts[j] = part.replace(',', ' — ', 1)
+                        break
+                continue
+            phrases = <tuple>draw[4]
+            picks = <list>draw[3]
+            if kind == 1 or not (<str>parts[0]).startswith(phrases):
+                parts.insert(0, phrases[<Py_ssize_t>picks[i]])
+        fused.extend(parts)
+    return fused
@@ -0,0 +1,14 @@
+"""
+Build the optional humanizer_core extension in place:
+
+    python setup.py build_ext --inplace
+
+aitexthumaizer.py falls back to pure Python when it isn't built.
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="humanizer_core",
+    ext_modules=cythonize("humanizer_core.pyx", language_level=3),
+)